@@ -1,13 +1,11 @@
+import "dotenv/config";
 import express from "express";
-import dotenv from "dotenv";
 import cors from "cors";
 import { ConnectDB } from "./src/lib/db.js";
 
 import portRoutes from "./src/routes/port.route.js";
 import pathRoutes from "./src/routes/path.route.js";
 
-dotenv.config();
-
 const app = express();
 
 app.use(cors({
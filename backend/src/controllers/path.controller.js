@@ -1,5 +1,21 @@
-import { Port } from "../models/port.model.js";
-import { axiosInstance } from "../lib/axios.js";
+import { findPortByCode, normalizePortCode } from "../lib/portCache.js";
+import { fetchRoute } from "../lib/routeRequests.js";
+
+const MAX_VIA_POINTS = 10;
+const MAX_ALTERNATIVES = 5;
+
+// Via points may be port codes or raw { lat, lng } coordinates (e.g. a canal entrance).
+const resolveViaPoint = async (via) => {
+  if (typeof via === "string") {
+    const port = await findPortByCode(via);
+    return port ? { lat: port.latitude, lng: port.longitude, key: normalizePortCode(via) } : null;
+  }
+
+  const lat = Number(via?.lat);
+  const lng = Number(via?.lng);
+  if (!Number.isFinite(lat) || !Number.isFinite(lng)) return null;
+  return { lat, lng, key: `${lat},${lng}` };
+};
 
 export const findPath = async (req, res) => {
   try {
@@ -9,13 +25,32 @@ export const findPath = async (req, res) => {
       return res.status(400).json({ message: "Route parameters are missing." });
     }
 
-    const sourcePort = await Port.findOne({ code: new RegExp(`^${sourceid}$`, 'i') });
-    const destinationPort = await Port.findOne({ code: new RegExp(`^${destinationid}$`, 'i') });
+    const via = req.body?.via ?? [];
+
+    if (!Array.isArray(via) || via.length > MAX_VIA_POINTS) {
+      return res.status(400).json({ message: `via must be a list of at most ${MAX_VIA_POINTS} ports or coordinates.` });
+    }
+
+    const alternatives = Number(req.body?.alternatives ?? 1);
+
+    if (!Number.isInteger(alternatives) || alternatives < 1 || alternatives > MAX_ALTERNATIVES) {
+      return res.status(400).json({ message: `alternatives must be an integer between 1 and ${MAX_ALTERNATIVES}.` });
+    }
+
+    const [sourcePort, destinationPort, ...viaPoints] = await Promise.all([
+      findPortByCode(sourceid),
+      findPortByCode(destinationid),
+      ...via.map(resolveViaPoint),
+    ]);
 
     if (!sourcePort || !destinationPort) {
       return res.status(404).json({ message: "Source or destination port not found." });
     }
 
+    if (viaPoints.some((point) => !point)) {
+      return res.status(404).json({ message: "Via port not found or invalid coordinates." });
+    }
+
     const payload = {
       start: {
         lat: sourcePort.latitude,
@@ -27,11 +62,27 @@ export const findPath = async (req, res) => {
       },
     };
 
-    const { data } = await axiosInstance.post('/path/find', payload);
+    if (viaPoints.length > 0) {
+      payload.waypoints = viaPoints.map(({ lat, lng }) => ({ lat, lng }));
+    }
+
+    if (alternatives > 1) {
+      payload.alternatives = alternatives;
+    }
+
+    const routeKey = [
+      normalizePortCode(sourceid),
+      ...viaPoints.map((point) => point.key),
+      normalizePortCode(destinationid),
+    ].join(":") + (alternatives > 1 ? `#${alternatives}` : "");
+    const data = await fetchRoute(routeKey, payload);
 
     return res.status(200).json(data);
 
   } catch (error) {
+    if (error.code === "ECONNABORTED") {
+      return res.status(504).json({ message: "Routing engine timed out." });
+    }
     if (error.response) {
       return res.status(error.response.status).json(error.response.data);
     }
@@ -1,10 +1,139 @@
 import { Port } from '../models/port.model.js';
+import { getPortCache } from '../lib/portCache.js';
+
+const DEFAULT_PAGE_SIZE = 500;
+const MAX_PAGE_SIZE = 2000;
+const DEFAULT_NEAREST = 5;
+const MAX_NEAREST = 50;
+const MAX_BOX_WIDTH = 90;
+const EDGE_STEP = 5;
+const MAX_LATITUDE = 89.9;
+
+const PORT_PROJECTION = { location: 0, __v: 0 };
+
+const parseNumber = (value) => {
+    if (value === undefined || value === '') return NaN;
+    return Number(value);
+};
+
+const clamp = (value, min, max) => Math.min(max, Math.max(min, value));
+
+const wrapLongitude = (lng) => ((((lng + 180) % 360) + 360) % 360) - 180;
+
+// Lines of latitude are not geodesics, so densify them to keep 2dsphere edges close to the box.
+const boxPolygon = (west, south, east, north) => {
+    const ring = [];
+    for (let lng = west; lng < east; lng += EDGE_STEP) ring.push([lng, south]);
+    ring.push([east, south]);
+    for (let lng = east; lng > west; lng -= EDGE_STEP) ring.push([lng, north]);
+    ring.push([west, north]);
+    ring.push([west, south]);
+    return { type: 'Polygon', coordinates: [ring] };
+};
+
+const splitLongitudes = (west, east) => {
+    if (east - west >= 360) return [[-180, 180]];
+
+    const wrappedWest = wrapLongitude(west);
+    const wrappedEast = wrapLongitude(east);
+
+    if (wrappedWest <= wrappedEast) return [[wrappedWest, wrappedEast]];
+    return [[wrappedWest, 180], [-180, wrappedEast]];
+};
+
+const buildBoundsFilter = (south, west, north, east) => {
+    const geometries = [];
+
+    for (const [from, to] of splitLongitudes(west, east)) {
+        // Keep every polygon well under a hemisphere so MongoDB does not pick the complement.
+        for (let start = from; start < to; start += MAX_BOX_WIDTH) {
+            const end = Math.min(to, start + MAX_BOX_WIDTH);
+            geometries.push(boxPolygon(start, south, end, north));
+        }
+    }
+
+    const clauses = geometries.map((geometry) => ({ location: { $geoWithin: { $geometry: geometry } } }));
+    return clauses.length === 1 ? clauses[0] : { $or: clauses };
+};
 
 export const displayPorts = async (req, res) => {
     try {
-        const allPorts = await Port.find({});
-        res.status(200).json(allPorts);
+        const { body, etag } = await getPortCache();
+
+        res.set('ETag', etag);
+        res.set('Cache-Control', 'no-cache');
+
+        if (req.fresh) {
+            return res.status(304).end();
+        }
+
+        res.status(200).type('application/json').send(body);
+    } catch (error) {
+        res.status(500).json({ message: "Error fetching port data" });
+    }
+};
+
+export const portsWithinBounds = async (req, res) => {
+    try {
+        const south = parseNumber(req.query.south);
+        const west = parseNumber(req.query.west);
+        const north = parseNumber(req.query.north);
+        const east = parseNumber(req.query.east);
+
+        if ([south, west, north, east].some(Number.isNaN) || south >= north || west >= east) {
+            return res.status(400).json({ message: "Invalid bounding box." });
+        }
+
+        const page = Math.max(1, parseInt(req.query.page, 10) || 1);
+        const limit = clamp(parseInt(req.query.limit, 10) || DEFAULT_PAGE_SIZE, 1, MAX_PAGE_SIZE);
+
+        const filter = buildBoundsFilter(
+            clamp(south, -MAX_LATITUDE, MAX_LATITUDE),
+            west,
+            clamp(north, -MAX_LATITUDE, MAX_LATITUDE),
+            east
+        );
+
+        const [ports, total] = await Promise.all([
+            Port.find(filter, PORT_PROJECTION)
+                .sort({ _id: 1 })
+                .skip((page - 1) * limit)
+                .limit(limit)
+                .lean(),
+            Port.countDocuments(filter),
+        ]);
+
+        res.status(200).json({ ports, page, limit, total, hasMore: page * limit < total });
+    } catch (error) {
+        res.status(500).json({ message: "Error fetching port data" });
+    }
+};
+
+export const nearestPorts = async (req, res) => {
+    try {
+        const lat = parseNumber(req.query.lat);
+        const lng = parseNumber(req.query.lng);
+
+        if (Number.isNaN(lat) || Number.isNaN(lng) || lat < -90 || lat > 90) {
+            return res.status(400).json({ message: "Invalid coordinates." });
+        }
+
+        const k = clamp(parseInt(req.query.k, 10) || DEFAULT_NEAREST, 1, MAX_NEAREST);
+
+        const ports = await Port.aggregate([
+            {
+                $geoNear: {
+                    near: { type: 'Point', coordinates: [wrapLongitude(lng), lat] },
+                    distanceField: 'distance',
+                    spherical: true,
+                },
+            },
+            { $limit: k },
+            { $project: PORT_PROJECTION },
+        ]);
+
+        res.status(200).json(ports);
     } catch (error) {
         res.status(500).json({ message: "Error fetching port data" });
     }
-};
\ No newline at end of file
+};
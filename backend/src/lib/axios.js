@@ -1,9 +1,21 @@
 import axios from "axios";
+import http from "http";
+
+const httpAgent = new http.Agent({
+    keepAlive: true,
+    keepAliveMsecs: 30000,
+    maxSockets: Number(process.env.ROUTING_MAX_SOCKETS) || 16,
+    maxFreeSockets: 4,
+});
 
 export const axiosInstance = axios.create({
-    baseURL: "http://127.0.0.1:5001",
+    baseURL: process.env.ROUTING_ENGINE_URL || "http://127.0.0.1:5001",
     withCredentials: true,
+    httpAgent,
+    // Generous enough for a cold search that runs through every fallback attempt,
+    // but finite so a hung routing engine cannot hold pooled sockets forever.
+    timeout: Number(process.env.ROUTING_TIMEOUT_MS) || 600000,
      headers: {
         'Content-Type': 'application/json'
     }
-});
\ No newline at end of file
+});
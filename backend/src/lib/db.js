@@ -1,10 +1,21 @@
 import mongoose from 'mongoose';
+import { Port } from '../models/port.model.js';
+import { watchPortChanges } from './portCache.js';
 
 export const ConnectDB = async () => {
     try
     {
         const conn = await mongoose.connect(process.env.MONGODB_URI);
         console.log(`Connected to MongoDB`);
+        try
+        {
+            await Port.syncLocations();
+        }
+        catch(error)
+        {
+            console.log(`Port location backfill failed: ${error.message}`);
+        }
+        watchPortChanges();
     }
     catch(error)
     {
@@ -0,0 +1,91 @@
+import crypto from "crypto";
+import { Port } from "../models/port.model.js";
+
+const FALLBACK_TTL_MS = Number(process.env.PORT_CACHE_TTL_MS) || 60000;
+
+let cache = null;
+let loading = null;
+let generation = 0;
+let watching = false;
+
+export const normalizePortCode = (code) => String(code).trim().toUpperCase();
+
+const buildCache = (ports) => {
+    const byCode = new Map();
+    for (const port of ports) {
+        byCode.set(normalizePortCode(port.code), port);
+    }
+
+    const body = JSON.stringify(ports);
+    const etag = `"${crypto.createHash("sha1").update(body).digest("base64url")}"`;
+
+    return { ports, byCode, body, etag, loadedAt: Date.now() };
+};
+
+const isStale = () => {
+    if (!cache) return true;
+    // Without a change stream we cannot hear about writes, so expire on a timer.
+    return !watching && Date.now() - cache.loadedAt > FALLBACK_TTL_MS;
+};
+
+export const invalidatePortCache = () => {
+    generation += 1;
+    cache = null;
+    // A load that started before this change may return old data; let the next caller start a fresh one.
+    loading = null;
+};
+
+export const getPortCache = async () => {
+    if (!isStale()) return cache;
+
+    if (!loading) {
+        const loadGeneration = generation;
+        const request = Port.find({}).select("-location").lean()
+            .then((ports) => {
+                const fresh = buildCache(ports);
+                if (loadGeneration === generation) {
+                    cache = fresh;
+                }
+                return fresh;
+            })
+            .finally(() => {
+                if (loading === request) {
+                    loading = null;
+                }
+            });
+        loading = request;
+    }
+
+    return loading;
+};
+
+export const findPortByCode = async (code) => {
+    const { byCode } = await getPortCache();
+    return byCode.get(normalizePortCode(code)) || null;
+};
+
+export const watchPortChanges = () => {
+    try {
+        const stream = Port.watch();
+        watching = true;
+
+        const stopWatching = () => {
+            if (!watching) return;
+            watching = false;
+            invalidatePortCache();
+        };
+
+        stream.on("change", invalidatePortCache);
+        stream.on("error", (error) => {
+            // Change streams need a replica set; standalone servers fall back to the TTL.
+            console.log(`Port change stream unavailable: ${error.message}`);
+            stopWatching();
+            stream.close().catch(() => {});
+        });
+        stream.on("close", stopWatching);
+        stream.on("end", stopWatching);
+    } catch (error) {
+        console.log(`Port change stream unavailable: ${error.message}`);
+        watching = false;
+    }
+};
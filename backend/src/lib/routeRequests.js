@@ -0,0 +1,50 @@
+import { axiosInstance } from "./axios.js";
+
+const CACHE_TTL_MS = Number(process.env.ROUTE_CACHE_TTL_MS) || 300000;
+const CACHE_MAX_ENTRIES = Number(process.env.ROUTE_CACHE_MAX_ENTRIES) || 500;
+
+const inFlight = new Map();
+const responses = new Map();
+
+const readCached = (key) => {
+    const entry = responses.get(key);
+    if (!entry) return null;
+
+    if (Date.now() > entry.expiresAt) {
+        responses.delete(key);
+        return null;
+    }
+
+    // Re-insert so Map order doubles as least-recently-used order.
+    responses.delete(key);
+    responses.set(key, entry);
+    return entry.data;
+};
+
+const storeCached = (key, data) => {
+    responses.set(key, { data, expiresAt: Date.now() + CACHE_TTL_MS });
+
+    while (responses.size > CACHE_MAX_ENTRIES) {
+        responses.delete(responses.keys().next().value);
+    }
+};
+
+// Concurrent callers with the same key share one upstream request to the routing engine.
+export const fetchRoute = (key, payload) => {
+    const cached = readCached(key);
+    if (cached) return Promise.resolve(cached);
+
+    if (inFlight.has(key)) return inFlight.get(key);
+
+    const request = axiosInstance.post('/path/find', payload)
+        .then(({ data }) => {
+            storeCached(key, data);
+            return data;
+        })
+        .finally(() => {
+            inFlight.delete(key);
+        });
+
+    inFlight.set(key, request);
+    return request;
+};
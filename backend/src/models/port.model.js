@@ -1,5 +1,17 @@
 import mongoose from "mongoose";
 
+const pointSchema = new mongoose.Schema({
+  type: {
+    type: String,
+    enum: ["Point"],
+    default: "Point",
+  },
+  coordinates: {
+    type: [Number],
+    required: true,
+  },
+}, { _id: false });
+
 const portSchema = new mongoose.Schema({
   countryName: {
     type: String,
@@ -22,6 +34,58 @@ const portSchema = new mongoose.Schema({
     type: Number,
     required: true,
   },
+  location: {
+    type: pointSchema,
+  },
 });
 
-export const Port = mongoose.model("Port", portSchema);
\ No newline at end of file
+portSchema.index({ location: "2dsphere" });
+
+portSchema.pre("validate", function () {
+  if (this.latitude != null && this.longitude != null) {
+    this.location = { type: "Point", coordinates: [this.longitude, this.latitude] };
+  }
+});
+
+const COORDINATE_FIELDS = ["latitude", "longitude"];
+
+const setsCoordinates = (fields) =>
+  COORDINATE_FIELDS.some((field) => field in fields);
+
+// Handles plain updates ({ latitude }), operator updates ({ $set: { latitude } })
+// and aggregation pipelines ([{ $set: { latitude } }]).
+const touchesCoordinates = (update) => {
+  if (!update) return false;
+  const stages = Array.isArray(update) ? update : [update];
+  return stages.some((stage) =>
+    setsCoordinates(stage) ||
+    Object.values(stage).some((op) => op && typeof op === "object" && setsCoordinates(op))
+  );
+};
+
+// Update queries bypass the validate hook, so re-derive the point for any document they moved.
+portSchema.post(["updateOne", "updateMany", "findOneAndUpdate"], async function () {
+  if (touchesCoordinates(this.getUpdate())) {
+    await this.model.syncLocations();
+  }
+});
+
+// Backfills the GeoJSON point for documents that lack one or whose point no longer matches latitude/longitude.
+// Runs on the driver collection so the update hook above does not fire for it again.
+portSchema.statics.syncLocations = function () {
+  return this.collection.updateMany(
+    {
+      $or: [
+        { location: { $exists: false } },
+        {
+          $expr: {
+            $ne: ["$location.coordinates", ["$longitude", "$latitude"]],
+          },
+        },
+      ],
+    },
+    [{ $set: { location: { type: "Point", coordinates: ["$longitude", "$latitude"] } } }]
+  );
+};
+
+export const Port = mongoose.model("Port", portSchema);
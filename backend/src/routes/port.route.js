@@ -1,8 +1,10 @@
 import { Router } from "express";
-import { displayPorts } from "../controllers/port.controller.js";
+import { displayPorts, nearestPorts, portsWithinBounds } from "../controllers/port.controller.js";
 
 const router = Router();
 
 router.get("/display-ports", displayPorts);
+router.get("/within-bounds", portsWithinBounds);
+router.get("/nearest", nearestPorts);
 
-export default router;
\ No newline at end of file
+export default router;
@@ -3,11 +3,14 @@ from flask import Flask, jsonify
 from dotenv import load_dotenv
 from src.routes.path_routes import path_bp
 from src.utils.data_loader import load_dataset
+from src.utils.route_store import load_route_store
 
 load_dotenv()
 
 app = Flask(__name__)
 app.config['ROUTE_CACHE'] = {}
+app.config['PROFILING_ENABLED'] = os.getenv('PROFILING_ENABLED', '').lower() in ('1', 'true', 'yes')
+app.config['PROFILE_REPORT_DIR'] = os.getenv('PROFILE_REPORT_DIR', 'profiles')
 
 try:
     gebco_path = os.getenv('GEBCO_FILE_PATH')
@@ -19,6 +22,16 @@ try:
 except Exception as e:
     app.config['GEBCO_DATASET'] = None
 
+try:
+    route_store_path = os.getenv('ROUTE_STORE_PATH')
+    if not route_store_path or not os.path.exists(route_store_path):
+        raise FileNotFoundError(f"Route store not found at path: {route_store_path}")
+
+    app.config['ROUTE_STORE'] = load_route_store(route_store_path)
+
+except Exception as e:
+    app.config['ROUTE_STORE'] = None
+
 app.register_blueprint(path_bp, url_prefix='/path')
 
 @app.errorhandler(404)
@@ -0,0 +1,230 @@
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+RSS_SAMPLE_INTERVAL = 1.0
+
+def make_synthetic_dataset(dataset_path, ports_path, num_ports, resolution, seed):
+    import xarray as xr
+
+    rng = np.random.default_rng(seed)
+    lat = np.arange(-70.0, 70.0 + resolution, resolution)
+    lon = np.arange(-180.0, 180.0, resolution)
+    lon_grid, lat_grid = np.meshgrid(lon, lat)
+
+    # Deep ocean with a handful of gaussian "continents" rising above sea level.
+    elevation = np.full(lon_grid.shape, -4000.0)
+    for _ in range(12):
+        c_lat = rng.uniform(-55, 55)
+        c_lon = rng.uniform(-170, 170)
+        radius = rng.uniform(6, 25)
+        dist2 = (lat_grid - c_lat) ** 2 + (lon_grid - c_lon) ** 2
+        elevation += 6000.0 * np.exp(-dist2 / (2 * radius ** 2))
+    elevation += rng.normal(0, 50, elevation.shape)
+
+    ds = xr.Dataset(
+        {'elevation': (('lat', 'lon'), elevation.astype(np.float32))},
+        coords={'lat': lat, 'lon': lon}
+    )
+    ds.to_netcdf(dataset_path)
+
+    # Ports sit in moderately shallow water, i.e. near the synthetic coasts.
+    coastal = np.argwhere((elevation < -20) & (elevation > -1500))
+    picks = coastal[rng.choice(len(coastal), size=min(num_ports, len(coastal)), replace=False)]
+    ports = [
+        {
+            'countryName': 'Synthetic',
+            'portName': f"Synthetic Port {i + 1}",
+            'code': f"SYN{i + 1:04d}",
+            'latitude': round(float(lat[r]), 5),
+            'longitude': round(float(lon[c]), 5)
+        }
+        for i, (r, c) in enumerate(picks)
+    ]
+    with open(ports_path, 'w') as f:
+        json.dump(ports, f, indent=2)
+
+    print(f">> Wrote {dataset_path} ({elevation.shape[0]}x{elevation.shape[1]}) and {len(ports)} ports to {ports_path}")
+
+def build_workload(ports, num_pairs, total_requests, zipf_s, seed):
+    rng = random.Random(seed)
+    pairs = set()
+    while len(pairs) < min(num_pairs, len(ports) * (len(ports) - 1)):
+        source, destination = rng.sample(range(len(ports)), 2)
+        pairs.add((source, destination))
+    pairs = [(ports[s], ports[d]) for s, d in sorted(pairs)]
+    rng.shuffle(pairs)
+
+    # Traffic concentrates on a few popular pairs, like real usage.
+    weights = [1.0 / (rank ** zipf_s) for rank in range(1, len(pairs) + 1)]
+    return rng.choices(pairs, weights=weights, k=total_requests)
+
+def make_request(target, base_url, source, destination, timeout):
+    if target == 'node':
+        url = f"{base_url}/path/{source['code']}/{destination['code']}/find-path"
+        body = b''
+    else:
+        url = f"{base_url}/path/find"
+        body = json.dumps({
+            'start': {'lat': source['latitude'], 'lng': source['longitude']},
+            'end': {'lat': destination['latitude'], 'lng': destination['longitude']}
+        }).encode()
+
+    req = urllib.request.Request(url, data=body, method='POST', headers={'Content-Type': 'application/json'})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except Exception:
+        status = None
+    return time.perf_counter() - started, status
+
+def read_rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+def sample_rss(pid, samples, stop, started):
+    while not stop.is_set():
+        rss = read_rss_mb(pid)
+        if rss is not None:
+            samples.append((time.perf_counter() - started, rss))
+        stop.wait(RSS_SAMPLE_INTERVAL)
+
+def percentiles(values):
+    if not values:
+        return {'p50': None, 'p95': None, 'p99': None, 'max': None}
+    arr = np.asarray(values) * 1000
+    return {
+        'p50': float(np.percentile(arr, 50)),
+        'p95': float(np.percentile(arr, 95)),
+        'p99': float(np.percentile(arr, 99)),
+        'max': float(arr.max())
+    }
+
+def run_load(args):
+    with open(args.ports) as f:
+        ports = json.load(f)
+
+    workload = build_workload(ports, args.pairs, args.requests, args.zipf, args.seed)
+    seen = set()
+    results = []
+    lock = threading.Lock()
+
+    rss_samples = []
+    stop = threading.Event()
+    started = time.perf_counter()
+    sampler = None
+    if args.pid:
+        sampler = threading.Thread(target=sample_rss, args=(args.pid, rss_samples, stop, started), daemon=True)
+        sampler.start()
+
+    def worker(pair):
+        source, destination = pair
+        key = (source['code'], destination['code'])
+        with lock:
+            cold = key not in seen
+            seen.add(key)
+        elapsed, status = make_request(args.target, args.url.rstrip('/'), source, destination, args.timeout)
+        with lock:
+            results.append((elapsed, status, cold))
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(worker, workload))
+
+    wall_time = time.perf_counter() - started
+    stop.set()
+    if sampler:
+        sampler.join()
+
+    ok = [elapsed for elapsed, status, _ in results if status == 200]
+    report = {
+        'target': args.target,
+        'url': args.url,
+        'requests': len(results),
+        'concurrency': args.concurrency,
+        'wall_time_s': wall_time,
+        'throughput_rps': len(results) / wall_time if wall_time else None,
+        'error_rate': 1 - len(ok) / len(results) if results else None,
+        'status_counts': {},
+        'latency_ms': percentiles(ok),
+        'cold_latency_ms': percentiles([e for e, s, cold in results if s == 200 and cold]),
+        'warm_latency_ms': percentiles([e for e, s, cold in results if s == 200 and not cold]),
+        'rss_mb': [{'t': round(t, 1), 'rss': round(rss, 1)} for t, rss in rss_samples]
+    }
+    for _, status, _ in results:
+        name = str(status) if status is not None else 'connection_error'
+        report['status_counts'][name] = report['status_counts'].get(name, 0) + 1
+
+    return report
+
+def print_report(report):
+    print(f">> {report['requests']} requests to {report['url']} ({report['target']}), concurrency {report['concurrency']}")
+    print(f">> Wall time {report['wall_time_s']:.1f}s, throughput {report['throughput_rps']:.2f} req/s, "
+          f"error rate {report['error_rate'] * 100:.1f}%")
+    print(f">> Status counts: {report['status_counts']}")
+    for name in ('latency_ms', 'cold_latency_ms', 'warm_latency_ms'):
+        stats = report[name]
+        if stats['p50'] is None:
+            print(f">> {name}: no successful requests")
+        else:
+            print(f">> {name}: p50 {stats['p50']:.0f}  p95 {stats['p95']:.0f}  p99 {stats['p99']:.0f}  max {stats['max']:.0f}")
+    if report['rss_mb']:
+        first, peak, last = report['rss_mb'][0]['rss'], max(s['rss'] for s in report['rss_mb']), report['rss_mb'][-1]['rss']
+        print(f">> RSS: start {first:.0f} MiB, peak {peak:.0f} MiB, end {last:.0f} MiB")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the routing API with a replayed mix of port pairs.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    make = sub.add_parser('make-dataset', help="Write a synthetic bathymetry file and matching port list")
+    make.add_argument('--dataset', default='synthetic_gebco.nc')
+    make.add_argument('--ports', default='synthetic_ports.json')
+    make.add_argument('--num-ports', type=int, default=200)
+    make.add_argument('--resolution', type=float, default=0.1)
+    make.add_argument('--seed', type=int, default=0)
+
+    run = sub.add_parser('run', help="Replay port pairs against a running service")
+    run.add_argument('--ports', default='synthetic_ports.json', help="Port list JSON (code, latitude, longitude)")
+    run.add_argument('--target', choices=('flask', 'node'), default='flask')
+    run.add_argument('--url', default=None, help="Defaults to http://127.0.0.1:5001 (flask) or :5000 (node)")
+    run.add_argument('--requests', type=int, default=500)
+    run.add_argument('--concurrency', type=int, default=8)
+    run.add_argument('--pairs', type=int, default=50, help="Distinct port pairs in the mix")
+    run.add_argument('--zipf', type=float, default=1.1, help="Popularity skew across pairs")
+    run.add_argument('--timeout', type=float, default=300)
+    run.add_argument('--pid', type=int, help="Server process to sample RSS from")
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--output', help="Also write the report as JSON")
+
+    args = parser.parse_args()
+
+    if args.command == 'make-dataset':
+        make_synthetic_dataset(args.dataset, args.ports, args.num_ports, args.resolution, args.seed)
+        return
+
+    if args.url is None:
+        args.url = 'http://127.0.0.1:5000' if args.target == 'node' else 'http://127.0.0.1:5001'
+
+    report = run_load(args)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
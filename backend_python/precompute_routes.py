@@ -0,0 +1,93 @@
+import argparse
+import itertools
+import json
+import os
+from multiprocessing import Pool
+from dotenv import load_dotenv
+from src.utils import pathfinder
+from src.utils.data_loader import load_dataset
+from src.utils.route_store import RouteStore
+
+_dataset = None
+
+def _init_worker(gebco_path):
+    global _dataset
+    _dataset = load_dataset(gebco_path)
+
+def _compute_pair(pair):
+    source, destination = pair
+    start = (source['latitude'], source['longitude'])
+    end = (destination['latitude'], destination['longitude'])
+    route, message, errors = pathfinder.find_route_with_fallbacks(_dataset, start, end)
+    if route:
+        return source['code'], destination['code'], start, end, route, pathfinder.path_distance_km(route), message
+    return source['code'], destination['code'], start, end, None, None, errors[-1] if errors else "No route"
+
+def load_ports(file_path, codes):
+    with open(file_path) as f:
+        ports = json.load(f)
+
+    ports = [
+        port for port in ports
+        if port.get('code') and port.get('latitude') is not None and port.get('longitude') is not None
+    ]
+    if codes:
+        wanted = {code.strip().upper() for code in codes}
+        ports = [port for port in ports if port['code'].strip().upper() in wanted]
+    return ports
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute routes between port pairs into a route store.")
+    parser.add_argument('ports_file', help="JSON list of ports, e.g. the output of GET /port/display-ports")
+    parser.add_argument('--output', default=os.getenv('ROUTE_STORE_PATH', 'routes.npz'))
+    parser.add_argument('--codes', help="Comma-separated port codes to restrict the pairs to")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--checkpoint', type=int, default=100, help="Save the store every N new routes")
+    parser.add_argument('--overwrite', action='store_true', help="Ignore an existing store instead of extending it")
+    args = parser.parse_args()
+
+    load_dotenv()
+    gebco_path = os.getenv('GEBCO_FILE_PATH')
+    if not gebco_path or not os.path.exists(gebco_path):
+        raise SystemExit(f"GEBCO file not found at path: {gebco_path}")
+
+    ports = load_ports(args.ports_file, args.codes.split(',') if args.codes else None)
+
+    if os.path.exists(args.output) and not args.overwrite:
+        store = RouteStore.load(args.output)
+    else:
+        store = RouteStore()
+
+    # Stored routes are served in both directions, so unordered pairs suffice.
+    pairs = [
+        (source, destination)
+        for source, destination in itertools.combinations(ports, 2)
+        if not store.contains(
+            (source['latitude'], source['longitude']),
+            (destination['latitude'], destination['longitude'])
+        )
+    ]
+    print(f">> {len(ports)} ports, {len(pairs)} pairs to compute, {len(store)} already stored")
+
+    added = 0
+    failed = 0
+    with Pool(processes=args.workers, initializer=_init_worker, initargs=(gebco_path,)) as pool:
+        for done, result in enumerate(pool.imap_unordered(_compute_pair, pairs), start=1):
+            source_code, destination_code, start, end, route, distance_km, message = result
+            if route:
+                store.add(start, end, route, distance_km)
+                added += 1
+                if added % args.checkpoint == 0:
+                    store.save(args.output)
+            else:
+                failed += 1
+                print(f">> {source_code} -> {destination_code} failed: {message}")
+
+            if done % 50 == 0 or done == len(pairs):
+                print(f">> {done}/{len(pairs)} pairs done ({added} stored, {failed} failed)")
+
+    store.save(args.output)
+    print(f">> Route store written to {args.output} with {len(store)} routes")
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,19 @@
 from flask import request, jsonify, current_app
 from src.utils import pathfinder
+from src.utils.profiler import run_profiled
+
+MAX_WAYPOINTS = 10
+MAX_ALTERNATIVES = 5
+
+def profiling_requested():
+    if not current_app.config.get('PROFILING_ENABLED'):
+        return False
+    flag = request.headers.get('X-Profile') or request.args.get('profile') or ''
+    return flag.lower() in ('1', 'true', 'yes')
 
 def find_path_controller():
     print(">> Flask /path/find hit")
 
-    dataset = current_app.config.get('GEBCO_DATASET')
-    if dataset is None:
-        print(">> Dataset is not loaded")
-        return jsonify({"status": "error", "message": "Dataset not loaded. Cannot process request."}), 503
-
     data = request.get_json()
     print(">> Received data:", data)
 
@@ -19,63 +24,120 @@ def find_path_controller():
     try:
         start_coords = (float(data['start']['lat']), float(data['start']['lng']))
         end_coords = (float(data['end']['lat']), float(data['end']['lng']))
-    except (ValueError, TypeError):
+        waypoints = tuple(
+            (float(point['lat']), float(point['lng'])) for point in data.get('waypoints') or []
+        )
+    except (ValueError, TypeError, KeyError):
         print(">> Invalid coordinate format")
         return jsonify({"status": "error", "message": "Invalid coordinate format."}), 400
 
+    if len(waypoints) > MAX_WAYPOINTS:
+        return jsonify({"status": "error", "message": f"At most {MAX_WAYPOINTS} waypoints are supported."}), 400
+
+    alternatives = data.get('alternatives')
+    if alternatives is None:
+        alternatives = 1
+    if isinstance(alternatives, bool) or not isinstance(alternatives, int) or not 1 <= alternatives <= MAX_ALTERNATIVES:
+        return jsonify({"status": "error", "message": f"alternatives must be an integer between 1 and {MAX_ALTERNATIVES}."}), 400
+
+    if alternatives > 1 and waypoints:
+        return jsonify({"status": "error", "message": "Alternative routes are not supported with waypoints."}), 400
+
     print(">> Start coords:", start_coords)
     print(">> End coords:", end_coords)
+    if waypoints:
+        print(">> Waypoints:", waypoints)
+
+    profile = profiling_requested()
+
+    route_store = current_app.config.get('ROUTE_STORE')
+    if route_store is not None and not profile and not waypoints and alternatives == 1:
+        stored = route_store.lookup(start_coords, end_coords)
+        if stored:
+            print(">> Returning precomputed route")
+            path, distance_km = stored
+            return jsonify({
+                "status": "success",
+                "message": f"Route found: {len(path)} waypoints, {distance_km:.0f}km (precomputed)",
+                "path": path
+            })
+
+    dataset = current_app.config.get('GEBCO_DATASET')
+    if dataset is None:
+        print(">> Dataset is not loaded")
+        return jsonify({"status": "error", "message": "Dataset not loaded. Cannot process request."}), 503
 
     cache = current_app.config['ROUTE_CACHE']
-    cache_key = (start_coords, end_coords)
+    cache_key = (start_coords, waypoints, end_coords, alternatives)
 
-    if cache_key in cache:
+    if cache_key in cache and not profile:
         print(">> Returning cached result")
         cached_result = cache[cache_key]
         cached_result['message'] += " (from cache)"
         return jsonify(cached_result)
 
-    padding_levels = [2.5, 5.0, 8.0, 12.0, 18.0, 25.0, 35.0, 50.0]
-    depth_levels = [-30.0, -25.0, -20.0, -15.0, -12.0, -10.0, -8.0, -6.0, -4.0, -2.0]
+    if waypoints:
+        points = [start_coords, *waypoints, end_coords]
+        compute = lambda: pathfinder.find_waypoint_route_with_fallbacks(dataset, points)
+    elif alternatives > 1:
+        compute = lambda: pathfinder.find_alternative_routes_with_fallbacks(dataset, start_coords, end_coords, alternatives)
+    else:
+        compute = lambda: pathfinder.find_route_with_fallbacks(dataset, start_coords, end_coords)
 
-    all_errors = []
-    
-    for pad in padding_levels:
-        for depth in depth_levels:
-            print(f">> Trying pathfind with depth={depth}, pad={pad}")
-            route, message = pathfinder.attempt_route_find(
-                ds=dataset,
-                start_point=start_coords,
-                end_point=end_coords,
-                min_depth_meters=depth,
-                subset_padding=pad
-            )
-            
-            if route:
-                print(">> Route found")
-                result = {
-                    "status": "success",
-                    "message": message,
-                    "path": route
-                }
-                cache[cache_key] = result
-                return jsonify(result)
-            else:
-                all_errors.append(f"Depth {depth}m, Pad {pad}°: {message}")
-                print(f">> Failed: {message}")
+    profile_id = None
+    if profile:
+        outcome, profile_id = run_profiled(
+            current_app.config['PROFILE_REPORT_DIR'],
+            " -> ".join(str(point) for point in (start_coords, *waypoints, end_coords)),
+            compute
+        )
+        print(">> Profile report:", profile_id)
+    else:
+        outcome = compute()
+
+    legs = None
+    routes = None
+    if waypoints:
+        route, message, legs, all_errors = outcome
+    elif alternatives > 1:
+        routes, message, all_errors = outcome
+        route = routes[0]['path'] if routes else None
+    else:
+        route, message, all_errors = outcome
+
+    if route:
+        print(">> Route found")
+        result = {
+            "status": "success",
+            "message": message,
+            "path": route
+        }
+        if legs:
+            result["legs"] = legs
+        if routes:
+            # The best route's coordinates are already in "path"; only its metrics are repeated.
+            result["best"] = {key: value for key, value in routes[0].items() if key != "path"}
+            result["routes"] = routes[1:]
+        cache[cache_key] = result
+        if profile_id:
+            return jsonify({**result, "profile_id": profile_id})
+        return jsonify(result)
 
     print(">> No valid route found after all attempts")
     
-    error_summary = f"Failed after {len(padding_levels) * len(depth_levels)} attempts. "
+    error_summary = f"Failed after {len(all_errors)} attempts. "
     if len(all_errors) > 0:
         error_summary += f"Final attempts: {'; '.join(all_errors[-3:])}"
     else:
         error_summary += "No detailed error information available."
     
-    return jsonify({
+    error_result = {
         "status": "error",
         "message": error_summary,
         "attempts": len(all_errors),
         "start_coords": start_coords,
         "end_coords": end_coords
-    }), 422
\ No newline at end of file
+    }
+    if profile_id:
+        error_result["profile_id"] = profile_id
+    return jsonify(error_result), 422
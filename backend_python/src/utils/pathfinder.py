@@ -3,10 +3,20 @@ from scipy.ndimage import distance_transform_edt, label, binary_dilation, binary
 from skimage.graph import route_through_array
 from skimage.morphology import skeletonize
 import heapq
+from src.utils.profiler import memory_checkpoint
 
 GLOBAL_MIN_DEPTH = -3.0
 MAX_BRIDGE_GAP = 100
 MIN_STRAIT_WIDTH = 2
+EARTH_RADIUS_KM = 6371
+
+DEPTH_LEVELS = [-30.0, -25.0, -20.0, -15.0, -12.0, -10.0, -8.0, -6.0, -4.0, -2.0]
+
+KM_PER_DEGREE = 111.32
+MIN_ROUTE_SEPARATION_KM = 150.0
+ROUTE_SEPARATION_FRACTION = 0.1
+CORRIDOR_PENALTY = 8.0
+MAX_ROUTE_OVERLAP = 0.5
 
 MAJOR_WATERWAYS = [
     {
@@ -371,32 +381,37 @@ def find_nearest_navigable_cell(grid, start_node, max_search_radius=500):
     return None
 
 def create_adaptive_bounds(start_point, end_point, ds):
+    return create_bounds_for_points([start_point, end_point], ds)
+
+def create_bounds_for_points(points, ds):
     global_min_lat = float(ds['lat'].min())
     global_max_lat = float(ds['lat'].max())
     global_min_lon = float(ds['lon'].min())
     global_max_lon = float(ds['lon'].max())
     
-    start_lat, start_lon = start_point
-    end_lat, end_lon = end_point
+    point_min_lat = min(lat for lat, _ in points)
+    point_max_lat = max(lat for lat, _ in points)
+    point_min_lon = min(lon for _, lon in points)
+    point_max_lon = max(lon for _, lon in points)
     
-    lon_span = abs(end_lon - start_lon)
-    lat_span = abs(end_lat - start_lat)
+    lon_span = point_max_lon - point_min_lon
+    lat_span = point_max_lat - point_min_lat
     
-    if lon_span > 150 or (start_lon * end_lon < 0 and lon_span > 100):
+    if lon_span > 150 or (point_min_lon * point_max_lon < 0 and lon_span > 100):
         return global_min_lat, global_max_lat, global_min_lon, global_max_lon
     
     if lon_span > 60 or lat_span > 30:
         padding = min(35, max(20, lon_span * 0.25, lat_span * 0.35))
-        min_lat = max(global_min_lat, min(start_lat, end_lat) - padding)
-        max_lat = min(global_max_lat, max(start_lat, end_lat) + padding)
-        min_lon = max(global_min_lon, min(start_lon, end_lon) - padding)
-        max_lon = min(global_max_lon, max(start_lon, end_lon) + padding)
+        min_lat = max(global_min_lat, point_min_lat - padding)
+        max_lat = min(global_max_lat, point_max_lat + padding)
+        min_lon = max(global_min_lon, point_min_lon - padding)
+        max_lon = min(global_max_lon, point_max_lon + padding)
     else:
         padding = max(15, lon_span * 0.4, lat_span * 0.5)
-        min_lat = max(global_min_lat, min(start_lat, end_lat) - padding)
-        max_lat = min(global_max_lat, max(start_lat, end_lat) + padding)
-        min_lon = max(global_min_lon, min(start_lon, end_lon) - padding)
-        max_lon = min(global_max_lon, max(start_lon, end_lon) + padding)
+        min_lat = max(global_min_lat, point_min_lat - padding)
+        max_lat = min(global_max_lat, point_max_lat + padding)
+        min_lon = max(global_min_lon, point_min_lon - padding)
+        max_lon = min(global_max_lon, point_max_lon + padding)
     
     return min_lat, max_lat, min_lon, max_lon
 
@@ -599,9 +614,9 @@ def enhance_shallow_connectivity(cost_grid, elevation_data, min_depth):
     
     return np.sum(new_water_areas) + np.sum(moderate_new_areas)
 
-def check_global_connectivity(cost_grid, start_idx, end_idx):
+def check_global_connectivity(cost_grid, start_idx, end_idx, labeled=None):
     water_mask = cost_grid != np.inf
-    labeled_array, num_features = label(water_mask)
+    labeled_array, num_features = labeled if labeled is not None else label(water_mask)
     
     if labeled_array[start_idx] == 0 or labeled_array[end_idx] == 0:
         return False, "Endpoints not in water"
@@ -611,125 +626,314 @@ def check_global_connectivity(cost_grid, start_idx, end_idx):
     
     return False, f"Disconnected: {num_features} components"
 
-def attempt_route_find(ds, start_point, end_point, min_depth_meters, subset_padding):
+def path_distance_km(path_coords):
+    total_distance = 0
+    for i in range(1, len(path_coords)):
+        lat1, lon1 = path_coords[i-1]
+        lat2, lon2 = path_coords[i]
+        dlat = np.radians(lat2 - lat1)
+        dlon = np.radians(lon2 - lon1)
+        a = (np.sin(dlat/2)**2 + 
+             np.cos(np.radians(lat1)) * np.cos(np.radians(lat2)) * 
+             np.sin(dlon/2)**2)
+        total_distance += EARTH_RADIUS_KM * 2 * np.arcsin(np.sqrt(a))
+    return float(total_distance)
+
+def prepare_route_grid(ds, points, min_depth_meters):
+    bounds = create_bounds_for_points(points, ds)
+    min_lat_req, max_lat_req, min_lon_req, max_lon_req = bounds
+    
+    if ds['lat'].values[0] > ds['lat'].values[-1]:
+        lat_slice = slice(max_lat_req, min_lat_req)
+    else:
+        lat_slice = slice(min_lat_req, max_lat_req)
+    
+    if ds['lon'].values[0] < ds['lon'].values[-1]:
+        lon_slice = slice(min_lon_req, max_lon_req)
+    else:
+        lon_slice = slice(max_lon_req, min_lon_req)
+    
+    subset = ds.sel(lat=lat_slice, lon=lon_slice)
+    
+    if subset.sizes['lat'] == 0 or subset.sizes['lon'] == 0:
+        return None, "Empty geographic subset"
+    
+    elevation_data = subset['elevation'].values
+    if elevation_data.size == 0:
+        return None, "No elevation data available"
+    
+    effective_min_depth = max(min_depth_meters, GLOBAL_MIN_DEPTH)
+    water_cells = np.sum(elevation_data <= effective_min_depth)
+    total_cells = elevation_data.size
+    water_percentage = (water_cells / total_cells) * 100
+    
+    if water_percentage < 0.05:
+        return None, f"Insufficient water: {water_percentage:.2f}%"
+    
+    max_dimension = max(elevation_data.shape)
+    scale_factor = 1
+    if max_dimension > 3000:
+        scale_factor = max_dimension // 2500
+    elif max_dimension > 2000:
+        scale_factor = 2
+    elif max_dimension > 1200:
+        scale_factor = max_dimension // 1000
+    
+    if scale_factor > 1:
+        scaled_elevation = elevation_data[::scale_factor, ::scale_factor]
+        scaled_lat = subset['lat'].values[::scale_factor]
+        scaled_lon = subset['lon'].values[::scale_factor]
+    else:
+        scaled_elevation = elevation_data
+        scaled_lat = subset['lat'].values
+        scaled_lon = subset['lon'].values
+    
+    cost_grid = create_navigable_grid(scaled_elevation, effective_min_depth)
+    
+    waterways_added = add_waterway_passages(cost_grid, scaled_lat, scaled_lon)
+    straits_created = create_strait_passages(cost_grid, scaled_elevation, effective_min_depth)
+    shallow_areas = enhance_shallow_connectivity(cost_grid, scaled_elevation, effective_min_depth)
+    connections = connect_water_components(cost_grid)
+    labeled = label(cost_grid != np.inf)
+    
+    # The subset, scaled elevation and cost grid are all live here, which is where a route request peaks.
+    memory_checkpoint()
+    
+    return {
+        'cost_grid': cost_grid,
+        'lat': scaled_lat,
+        'lon': scaled_lon,
+        'scale_factor': scale_factor,
+        'waterways_added': waterways_added,
+        'straits_created': straits_created,
+        'connections': connections,
+        'labeled': labeled
+    }, "Grid prepared"
+
+def find_path_indices(grid, start_point, end_point, cost_grid=None):
+    if cost_grid is None:
+        cost_grid = grid['cost_grid']
+    scaled_lat = grid['lat']
+    scaled_lon = grid['lon']
+    
+    start_idx = coord_to_grid_index(start_point[0], start_point[1], scaled_lat, scaled_lon)
+    end_idx = coord_to_grid_index(end_point[0], end_point[1], scaled_lat, scaled_lon)
+    
+    search_radius = min(1000, max(cost_grid.shape) // 2)
+    nav_start = find_nearest_navigable_cell(cost_grid, start_idx, search_radius)
+    if nav_start is None:
+        return None, "No navigable water near start"
+    
+    nav_end = find_nearest_navigable_cell(cost_grid, end_idx, search_radius)
+    if nav_end is None:
+        return None, "No navigable water near end"
+    
+    if nav_start == nav_end:
+        return None, "Start and end are identical"
+    
+    is_connected, conn_msg = check_global_connectivity(cost_grid, nav_start, nav_end, grid['labeled'])
+    if not is_connected:
+        return None, f"Not connected: {conn_msg} (waterways:{grid['waterways_added']}, straits:{grid['straits_created']}, connections:{grid['connections']})"
+    
     try:
-        bounds = create_adaptive_bounds(start_point, end_point, ds)
-        min_lat_req, max_lat_req, min_lon_req, max_lon_req = bounds
+        path_indices, total_cost = route_through_array(
+            cost_grid, nav_start, nav_end, 
+            fully_connected=True, geometric=True
+        )
         
-        if ds['lat'].values[0] > ds['lat'].values[-1]:
-            lat_slice = slice(max_lat_req, min_lat_req)
-        else:
-            lat_slice = slice(min_lat_req, max_lat_req)
-        
-        if ds['lon'].values[0] < ds['lon'].values[-1]:
-            lon_slice = slice(min_lon_req, max_lon_req)
-        else:
-            lon_slice = slice(max_lon_req, min_lon_req)
-        
-        subset = ds.sel(lat=lat_slice, lon=lon_slice)
-        
-        if subset.sizes['lat'] == 0 or subset.sizes['lon'] == 0:
-            return None, "Empty geographic subset"
-        
-        elevation_data = subset['elevation'].values
-        if elevation_data.size == 0:
-            return None, "No elevation data available"
-        
-        effective_min_depth = max(min_depth_meters, GLOBAL_MIN_DEPTH)
-        water_cells = np.sum(elevation_data <= effective_min_depth)
-        total_cells = elevation_data.size
-        water_percentage = (water_cells / total_cells) * 100
+        if not path_indices or len(path_indices) < 2:
+            path_indices, total_cost = route_through_array(
+                cost_grid, nav_start, nav_end, 
+                fully_connected=True, geometric=False
+            )
         
-        if water_percentage < 0.05:
-            return None, f"Insufficient water: {water_percentage:.2f}%"
+        if not path_indices or len(path_indices) < 2:
+            return None, "Pathfinding algorithm failed"
         
-        max_dimension = max(elevation_data.shape)
-        scale_factor = 1
-        if max_dimension > 3000:
-            scale_factor = max_dimension // 2500
-        elif max_dimension > 2000:
-            scale_factor = 2
-        elif max_dimension > 1200:
-            scale_factor = max_dimension // 1000
+        return path_indices, "Path found"
         
-        if scale_factor > 1:
-            scaled_elevation = elevation_data[::scale_factor, ::scale_factor]
-            scaled_lat = subset['lat'].values[::scale_factor]
-            scaled_lon = subset['lon'].values[::scale_factor]
+    except Exception as e:
+        return None, f"Pathfinding execution failed: {str(e)}"
+
+def indices_to_coords(grid, path_indices):
+    scaled_lat = grid['lat']
+    scaled_lon = grid['lon']
+    path_coords = []
+    for r, c in path_indices:
+        if 0 <= r < len(scaled_lat) and 0 <= c < len(scaled_lon):
+            path_coords.append([float(scaled_lat[r]), float(scaled_lon[c])])
+    return path_coords
+
+def search_route_on_grid(grid, start_point, end_point):
+    path_indices, message = find_path_indices(grid, start_point, end_point)
+    if path_indices is None:
+        return None, message
+    
+    path_coords = indices_to_coords(grid, path_indices)
+    if len(path_coords) < 2:
+        return None, "Invalid coordinate conversion"
+    
+    total_distance = path_distance_km(path_coords)
+    
+    return path_coords, f"Route found: {len(path_coords)} waypoints, {total_distance:.0f}km, waterways:{grid['waterways_added']}, scale:{grid['scale_factor']}"
+
+# Uses the grid's mean latitude for the longitude spacing, which is close enough for
+# telling routes apart but not for measuring them.
+def grid_cell_size_km(grid):
+    lat_step = abs(grid['lat'][1] - grid['lat'][0]) if len(grid['lat']) > 1 else 0.1
+    lon_step = abs(grid['lon'][1] - grid['lon'][0]) if len(grid['lon']) > 1 else 0.1
+    mean_lat = np.radians(float(np.mean(grid['lat'])))
+    return (
+        float(lat_step * KM_PER_DEGREE),
+        float(max(lon_step * KM_PER_DEGREE * np.cos(mean_lat), 1e-3))
+    )
+
+def distance_field_km(shape, cells, cell_size_km):
+    background = np.ones(shape, dtype=bool)
+    cell_array = np.asarray(cells)
+    background[cell_array[:, 0], cell_array[:, 1]] = False
+    return distance_transform_edt(background, sampling=cell_size_km)
+
+# A candidate counts as a new route only if most of its cells (outside the shared port
+# approaches) lie further than the separation distance from every accepted route. Each
+# candidate's corridor of that width is then penalized on a working copy of the cost
+# grid and the search is repeated, so alternatives never rebuild the grid.
+def find_alternative_routes(grid, start_point, end_point, k):
+    cost_grid = grid['cost_grid']
+    path_indices, message = find_path_indices(grid, start_point, end_point)
+    if path_indices is None:
+        return [], message
+    
+    best_coords = indices_to_coords(grid, path_indices)
+    if len(best_coords) < 2:
+        return [], "Invalid coordinate conversion"
+    
+    cell_size_km = grid_cell_size_km(grid)
+    separation_km = max(MIN_ROUTE_SEPARATION_KM, path_distance_km(best_coords) * ROUTE_SEPARATION_FRACTION)
+    
+    # Every route has to leave and reach the same ports, so the approaches are neither penalized nor scored.
+    endpoint_zone = distance_field_km(cost_grid.shape, [path_indices[0], path_indices[-1]], cell_size_km) <= separation_km
+    
+    accepted_distance = np.full(cost_grid.shape, np.inf)
+    working_grid = cost_grid.copy()
+    routes = []
+    
+    for _ in range(k * 3):
+        path_array = np.asarray(path_indices)
+        rows, cols = path_array[:, 0], path_array[:, 1]
+        
+        if routes:
+            outside = ~endpoint_zone[rows, cols]
+            near = accepted_distance[rows, cols] <= separation_km
+            overlap = float(near[outside].mean()) if outside.any() else 1.0
         else:
-            scaled_elevation = elevation_data
-            scaled_lat = subset['lat'].values
-            scaled_lon = subset['lon'].values
-        
-        cost_grid = create_navigable_grid(scaled_elevation, effective_min_depth)
-        
-        waterways_added = add_waterway_passages(cost_grid, scaled_lat, scaled_lon)
-        straits_created = create_strait_passages(cost_grid, scaled_elevation, effective_min_depth)
-        shallow_areas = enhance_shallow_connectivity(cost_grid, scaled_elevation, effective_min_depth)
-        connections = connect_water_components(cost_grid)
-        
-        def coord_to_index(lat, lon, grid_lat, grid_lon):
-            lat_idx = np.abs(grid_lat - lat).argmin()
-            lon_idx = np.abs(grid_lon - lon).argmin()
-            return int(lat_idx), int(lon_idx)
-        
-        start_idx = coord_to_index(start_point[0], start_point[1], scaled_lat, scaled_lon)
-        end_idx = coord_to_index(end_point[0], end_point[1], scaled_lat, scaled_lon)
-        
-        search_radius = min(1000, max(cost_grid.shape) // 2)
-        nav_start = find_nearest_navigable_cell(cost_grid, start_idx, search_radius)
-        if nav_start is None:
-            return None, "No navigable water near start"
-        
-        nav_end = find_nearest_navigable_cell(cost_grid, end_idx, search_radius)
-        if nav_end is None:
-            return None, "No navigable water near end"
-        
-        if nav_start == nav_end:
-            return None, "Start and end are identical"
-        
-        is_connected, conn_msg = check_global_connectivity(cost_grid, nav_start, nav_end)
-        if not is_connected:
-            return None, f"Not connected: {conn_msg} (waterways:{waterways_added}, straits:{straits_created}, connections:{connections})"
+            overlap = 0.0
+        
+        path_distance = distance_field_km(cost_grid.shape, path_indices, cell_size_km)
+        
+        if overlap <= MAX_ROUTE_OVERLAP:
+            path_coords = indices_to_coords(grid, path_indices)
+            if len(path_coords) >= 2:
+                routes.append({
+                    "path": path_coords,
+                    "waypoints": len(path_coords),
+                    "distance_km": round(path_distance_km(path_coords), 1),
+                    "overlap": round(overlap, 2)
+                })
+                np.minimum(accepted_distance, path_distance, out=accepted_distance)
+                if len(routes) == k:
+                    break
+        
+        # Rejected candidates are penalized as well so the next search moves further
+        # away, but only accepted routes feed the overlap measure.
+        working_grid[(path_distance <= separation_km) & ~endpoint_zone] *= CORRIDOR_PENALTY
+        
+        path_indices, message = find_path_indices(grid, start_point, end_point, working_grid)
+        if path_indices is None:
+            break
+    
+    return routes, f"Found {len(routes)} of {k} routes"
+
+def attempt_route_find(ds, start_point, end_point, min_depth_meters, subset_padding=None):
+    try:
+        grid, message = prepare_route_grid(ds, [start_point, end_point], min_depth_meters)
+        if grid is None:
+            return None, message
         
-        try:
-            path_indices, total_cost = route_through_array(
-                cost_grid, nav_start, nav_end, 
-                fully_connected=True, geometric=True
-            )
-            
-            if not path_indices or len(path_indices) < 2:
-                path_indices, total_cost = route_through_array(
-                    cost_grid, nav_start, nav_end, 
-                    fully_connected=True, geometric=False
-                )
-            
-            if not path_indices or len(path_indices) < 2:
-                return None, "Pathfinding algorithm failed"
-            
-            path_coords = []
-            for r, c in path_indices:
-                if 0 <= r < len(scaled_lat) and 0 <= c < len(scaled_lon):
-                    path_coords.append([float(scaled_lat[r]), float(scaled_lon[c])])
-            
-            if len(path_coords) < 2:
-                return None, "Invalid coordinate conversion"
-            
-            total_distance = 0
-            for i in range(1, len(path_coords)):
-                lat1, lon1 = path_coords[i-1]
-                lat2, lon2 = path_coords[i]
-                dlat = np.radians(lat2 - lat1)
-                dlon = np.radians(lon2 - lon1)
-                a = (np.sin(dlat/2)**2 + 
-                     np.cos(np.radians(lat1)) * np.cos(np.radians(lat2)) * 
-                     np.sin(dlon/2)**2)
-                total_distance += 6371 * 2 * np.arcsin(np.sqrt(a))
+        return search_route_on_grid(grid, start_point, end_point)
+    
+    except Exception as e:
+        return None, f"Route computation failed: {str(e)}"
+
+def attempt_waypoint_route_find(ds, points, min_depth_meters):
+    try:
+        grid, message = prepare_route_grid(ds, points, min_depth_meters)
+        if grid is None:
+            return None, message, []
+        
+        # Legs are searched one after another on the shared grid: the path search holds
+        # the GIL throughout, so threads would not overlap, and a failed leg stops early.
+        legs = list(zip(points[:-1], points[1:]))
+        
+        path_coords = []
+        leg_metrics = []
+        for i, (leg_start, leg_end) in enumerate(legs):
+            leg_path, leg_message = search_route_on_grid(grid, leg_start, leg_end)
+            if not leg_path:
+                return None, f"Leg {i + 1}: {leg_message}", []
             
-            return path_coords, f"Route found: {len(path_coords)} waypoints, {total_distance:.0f}km, waterways:{waterways_added}, scale:{scale_factor}"
+            if path_coords and path_coords[-1] == leg_path[0]:
+                path_coords.extend(leg_path[1:])
+            else:
+                path_coords.extend(leg_path)
             
-        except Exception as e:
-            return None, f"Pathfinding execution failed: {str(e)}"
+            leg_metrics.append({
+                "from": list(leg_start),
+                "to": list(leg_end),
+                "waypoints": len(leg_path),
+                "distance_km": round(path_distance_km(leg_path), 1)
+            })
+        
+        total_distance = sum(leg['distance_km'] for leg in leg_metrics)
+        return path_coords, f"Route found: {len(legs)} legs, {len(path_coords)} waypoints, {total_distance:.0f}km, waterways:{grid['waterways_added']}, scale:{grid['scale_factor']}", leg_metrics
     
     except Exception as e:
-        return None, f"Route computation failed: {str(e)}"
\ No newline at end of file
+        return None, f"Route computation failed: {str(e)}", []
+
+# Bounds come from the points themselves (subset_padding is unused), so only the depth requirement is relaxed.
+def find_route_with_fallbacks(ds, start_point, end_point):
+    errors = []
+    for depth in DEPTH_LEVELS:
+        route, message = attempt_route_find(
+            ds=ds,
+            start_point=start_point,
+            end_point=end_point,
+            min_depth_meters=depth
+        )
+        if route:
+            return route, message, errors
+        errors.append(f"Depth {depth}m: {message}")
+    return None, None, errors
+
+def find_waypoint_route_with_fallbacks(ds, points):
+    errors = []
+    for depth in DEPTH_LEVELS:
+        route, message, legs = attempt_waypoint_route_find(ds, points, depth)
+        if route:
+            return route, message, legs, errors
+        errors.append(f"Depth {depth}m: {message}")
+    return None, None, [], errors
+
+def find_alternative_routes_with_fallbacks(ds, start_point, end_point, k):
+    errors = []
+    for depth in DEPTH_LEVELS:
+        try:
+            grid, message = prepare_route_grid(ds, [start_point, end_point], depth)
+            if grid is not None:
+                routes, message = find_alternative_routes(grid, start_point, end_point, k)
+                if routes:
+                    return routes, message, errors
+        except Exception as e:
+            message = f"Route computation failed: {str(e)}"
+        errors.append(f"Depth {depth}m: {message}")
+    return [], None, errors
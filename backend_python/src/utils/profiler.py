@@ -0,0 +1,84 @@
+import cProfile
+import io
+import os
+import pstats
+import threading
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+
+TOP_FUNCTIONS = 60
+TOP_ALLOCATIONS = 25
+
+# tracemalloc is process wide, so only one profiled run may be active at a time.
+_profile_lock = threading.Lock()
+
+_profiling_thread = None
+_checkpoint_bytes = 0
+_checkpoint_snapshot = None
+
+# Called where route computation holds the most memory (e.g. right after a grid is
+# prepared); keeps a snapshot of the largest live heap seen during a profiled run.
+# Only the profiled request's own thread may record one, so concurrent unprofiled
+# requests cannot replace it.
+def memory_checkpoint():
+    global _checkpoint_bytes, _checkpoint_snapshot
+    if _profiling_thread != threading.get_ident() or not tracemalloc.is_tracing():
+        return
+    current_bytes, _ = tracemalloc.get_traced_memory()
+    if current_bytes > _checkpoint_bytes:
+        _checkpoint_bytes = current_bytes
+        _checkpoint_snapshot = tracemalloc.take_snapshot()
+
+def _write_report(report_path, label, profile, peak_bytes, snapshot, snapshot_title, elapsed):
+    stats_stream = io.StringIO()
+    pstats.Stats(profile, stream=stats_stream).sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+
+    with open(report_path, 'w') as f:
+        f.write(f"Profile: {label}\n")
+        f.write(f"Wall time: {elapsed:.3f}s\n")
+        f.write(f"Peak traced memory: {peak_bytes / (1024 * 1024):.1f} MiB\n")
+        f.write("Note: tracemalloc traces the whole process, so the peak and the allocation sites\n")
+        f.write("also include any other requests that ran at the same time.\n\n")
+        f.write(f"Top {TOP_ALLOCATIONS} allocation sites {snapshot_title}:\n")
+        for stat in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]:
+            f.write(f"  {stat}\n")
+        f.write("\nCPU profile (cumulative):\n")
+        f.write(stats_stream.getvalue())
+
+def run_profiled(report_dir, label, func, *args, **kwargs):
+    os.makedirs(report_dir, exist_ok=True)
+    report_id = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+    global _profiling_thread, _checkpoint_bytes, _checkpoint_snapshot
+
+    with _profile_lock:
+        _checkpoint_bytes = 0
+        _checkpoint_snapshot = None
+        _profiling_thread = threading.get_ident()
+        profile = cProfile.Profile()
+        tracemalloc.start()
+        started = datetime.now(timezone.utc)
+        try:
+            profile.enable()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                profile.disable()
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            if _checkpoint_snapshot is not None:
+                snapshot = _checkpoint_snapshot
+                snapshot_title = f"at largest checkpoint ({_checkpoint_bytes / (1024 * 1024):.1f} MiB live)"
+            else:
+                snapshot = tracemalloc.take_snapshot()
+                snapshot_title = "live at end of run"
+        finally:
+            tracemalloc.stop()
+            _profiling_thread = None
+            _checkpoint_snapshot = None
+        elapsed = (datetime.now(timezone.utc) - started).total_seconds()
+
+    profile.dump_stats(os.path.join(report_dir, f"{report_id}.prof"))
+    _write_report(os.path.join(report_dir, f"{report_id}.txt"), label, profile, peak_bytes, snapshot, snapshot_title, elapsed)
+
+    return result, report_id
@@ -0,0 +1,118 @@
+import os
+import numpy as np
+
+COORD_SCALE = 100000
+
+def quantize_point(point):
+    return (int(round(point[0] * COORD_SCALE)), int(round(point[1] * COORD_SCALE)))
+
+def encode_path(path_coords):
+    scaled = np.rint(np.asarray(path_coords, dtype=np.float64) * COORD_SCALE).astype(np.int32)
+    deltas = np.empty_like(scaled)
+    deltas[0] = scaled[0]
+    deltas[1:] = np.diff(scaled, axis=0)
+    return deltas
+
+def decode_path(deltas):
+    scaled = np.cumsum(deltas, axis=0, dtype=np.int64)
+    return (scaled / COORD_SCALE).tolist()
+
+# Paths are stored back to back as delta-encoded int32 (lat, lon) pairs;
+# offsets/lengths index into that array per route.
+class RouteStore:
+    def __init__(self, keys=None, offsets=None, lengths=None, distances=None, coords=None):
+        self.keys = np.zeros((0, 4), dtype=np.int32) if keys is None else keys
+        self.offsets = np.zeros(0, dtype=np.int64) if offsets is None else offsets
+        self.lengths = np.zeros(0, dtype=np.int32) if lengths is None else lengths
+        self.distances = np.zeros(0, dtype=np.float32) if distances is None else distances
+        self.coords = np.zeros((0, 2), dtype=np.int32) if coords is None else coords
+        self._pending = []
+        self._pending_keys = set()
+        self._build_index()
+
+    def _build_index(self):
+        self._index = {tuple(key): i for i, key in enumerate(self.keys.tolist())}
+
+    def __len__(self):
+        return len(self._index) + len(self._pending)
+
+    @classmethod
+    def load(cls, file_path):
+        with np.load(file_path) as data:
+            return cls(
+                keys=data['keys'],
+                offsets=data['offsets'],
+                lengths=data['lengths'],
+                distances=data['distances'],
+                coords=data['coords']
+            )
+
+    def contains(self, start_point, end_point):
+        start_key = quantize_point(start_point)
+        end_key = quantize_point(end_point)
+        return any(
+            key in self._index or key in self._pending_keys
+            for key in (start_key + end_key, end_key + start_key)
+        )
+
+    def add(self, start_point, end_point, path_coords, distance_km):
+        key = quantize_point(start_point) + quantize_point(end_point)
+        self._pending.append((key, encode_path(path_coords), distance_km))
+        self._pending_keys.add(key)
+
+    def lookup(self, start_point, end_point):
+        start_key = quantize_point(start_point)
+        end_key = quantize_point(end_point)
+
+        i = self._index.get(start_key + end_key)
+        reverse = False
+        if i is None:
+            i = self._index.get(end_key + start_key)
+            reverse = True
+        if i is None:
+            return None
+
+        offset = int(self.offsets[i])
+        path = decode_path(self.coords[offset:offset + int(self.lengths[i])])
+        if reverse:
+            path.reverse()
+        return path, float(self.distances[i])
+
+    def _flush_pending(self):
+        if not self._pending:
+            return
+
+        keys = [self.keys]
+        lengths = [self.lengths]
+        distances = [self.distances]
+        coords = [self.coords]
+        for key, deltas, distance_km in self._pending:
+            keys.append(np.asarray([key], dtype=np.int32))
+            lengths.append(np.asarray([len(deltas)], dtype=np.int32))
+            distances.append(np.asarray([distance_km], dtype=np.float32))
+            coords.append(deltas)
+
+        self.keys = np.concatenate(keys)
+        self.lengths = np.concatenate(lengths)
+        self.distances = np.concatenate(distances)
+        self.coords = np.concatenate(coords)
+        self.offsets = np.concatenate(([0], np.cumsum(self.lengths[:-1], dtype=np.int64))).astype(np.int64)
+        self._pending = []
+        self._pending_keys = set()
+        self._build_index()
+
+    def save(self, file_path):
+        self._flush_pending()
+        tmp_path = f"{file_path}.tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            keys=self.keys,
+            offsets=self.offsets,
+            lengths=self.lengths,
+            distances=self.distances,
+            coords=self.coords
+        )
+        os.replace(tmp_path, file_path)
+
+def load_route_store(file_path):
+    return RouteStore.load(file_path)
@@ -2,6 +2,7 @@ import React, { useEffect, useRef, useState } from 'react';
 import L from 'leaflet';
 import 'leaflet/dist/leaflet.css';
 import { axiosInstance } from '../lib/axios';
+import { portClusterLayer } from '../lib/portClusterLayer';
 import SourceDestination from './homepagecomponents/SourceDestination.jsx';
 import logo from '../assets/logo.png';
 
@@ -14,88 +15,102 @@ const HomePage = () => {
   const sourceRippleRef = useRef(null);
   const destRippleRef = useRef(null);
   const pathLayerRef = useRef(null);
+  const pathAnimationRef = useRef(null);
 
   const createRippleEffect = (lat, lng, color) => {
-    const ripple = L.circle([lat, lng], {
+    const minRadius = 50000;
+    const maxRadius = 200000;
+    const period = 3000;
+
+    const circle = L.circle([lat, lng], {
       color: color,
       fillColor: color,
       fillOpacity: 0.3,
-      radius: 50000,
+      radius: minRadius,
       weight: 3
     }).addTo(mapRef.current);
 
-    let currentRadius = 50000;
-    const maxRadius = 200000;
-    const step = 5000;
-    
-    const animate = () => {
-      currentRadius += step;
-      if (currentRadius <= maxRadius) {
-        ripple.setRadius(currentRadius);
-        ripple.setStyle({
-          fillOpacity: 0.3 - (currentRadius - 50000) / (maxRadius - 50000) * 0.3,
-          opacity: 1 - (currentRadius - 50000) / (maxRadius - 50000) * 0.5
-        });
-        setTimeout(animate, 100);
-      } else {
-        currentRadius = 50000;
-        setTimeout(animate, 100);
-      }
+    let frameId = null;
+    const startedAt = performance.now();
+
+    const animate = (now) => {
+      const progress = ((now - startedAt) % period) / period;
+      circle.setRadius(minRadius + (maxRadius - minRadius) * progress);
+      circle.setStyle({
+        fillOpacity: 0.3 - progress * 0.3,
+        opacity: 1 - progress * 0.5
+      });
+      frameId = requestAnimationFrame(animate);
+    };
+
+    frameId = requestAnimationFrame(animate);
+
+    return {
+      circle,
+      cancel: () => cancelAnimationFrame(frameId)
     };
-    
-    animate();
-    return ripple;
   };
 
-  const animatePath = (pathCoordinates) => {
+  const removeRipple = (rippleRef) => {
+    if (rippleRef.current) {
+      rippleRef.current.cancel();
+      rippleRef.current.circle.remove();
+      rippleRef.current = null;
+    }
+  };
+
+  const clearPath = () => {
+    if (pathAnimationRef.current) {
+      cancelAnimationFrame(pathAnimationRef.current);
+      pathAnimationRef.current = null;
+    }
     if (pathLayerRef.current) {
-      mapRef.current.removeLayer(pathLayerRef.current);
+      pathLayerRef.current.remove();
+      pathLayerRef.current = null;
     }
+  };
+
+  const animatePath = (pathCoordinates) => {
+    clearPath();
 
     const bounds = L.latLngBounds(pathCoordinates);
     mapRef.current.fitBounds(bounds, { padding: [50, 50] });
 
-    let animatedCoordinates = [];
-    let currentIndex = 0;
+    const shadowLine = L.polyline([], {
+      color: '#1E40AF',
+      weight: 6,
+      opacity: 0.3,
+      lineCap: 'round',
+      lineJoin: 'round'
+    });
 
-    const addNextPoint = () => {
-      if (currentIndex < pathCoordinates.length) {
-        const step = Math.ceil(pathCoordinates.length / 200);
-        for (let i = 0; i < step && currentIndex < pathCoordinates.length; i++) {
-          animatedCoordinates.push(pathCoordinates[currentIndex]);
-          currentIndex++;
-        }
-        
-        if (pathLayerRef.current) {
-          mapRef.current.removeLayer(pathLayerRef.current);
-        }
-        
-        pathLayerRef.current = L.polyline(animatedCoordinates, {
-          color: '#0F172A',
-          weight: 4,
-          opacity: 0.9,
-          lineCap: 'round',
-          lineJoin: 'round',
-          dashArray: '10, 5',
-          className: 'shipping-route'
-        }).addTo(mapRef.current);
+    const routeLine = L.polyline([], {
+      color: '#0F172A',
+      weight: 4,
+      opacity: 0.9,
+      lineCap: 'round',
+      lineJoin: 'round',
+      dashArray: '10, 5'
+    });
 
-        const shadowLine = L.polyline(animatedCoordinates, {
-          color: '#1E40AF',
-          weight: 6,
-          opacity: 0.3,
-          lineCap: 'round',
-          lineJoin: 'round'
-        }).addTo(mapRef.current);
-        shadowLine.bringToBack();
-        
-        if (currentIndex < pathCoordinates.length) {
-          requestAnimationFrame(addNextPoint);
-        }
+    pathLayerRef.current = L.layerGroup([shadowLine, routeLine]).addTo(mapRef.current);
+
+    const step = Math.ceil(pathCoordinates.length / 200);
+    let currentIndex = 0;
+
+    const addNextPoints = () => {
+      const end = Math.min(currentIndex + step, pathCoordinates.length);
+      for (; currentIndex < end; currentIndex++) {
+        shadowLine.addLatLng(pathCoordinates[currentIndex]);
+        routeLine.addLatLng(pathCoordinates[currentIndex]);
       }
+
+      pathAnimationRef.current = currentIndex < pathCoordinates.length
+        ? requestAnimationFrame(addNextPoints)
+        : null;
     };
 
-    addNextPoint();
+    pathAnimationRef.current = requestAnimationFrame(addNextPoints);
   };
   
   const fetchAndDrawPath = async (sourcePort, destPort) => {
@@ -126,9 +141,7 @@ const HomePage = () => {
   const handlePortSelection = (type, port) => {
     if (port && port.latitude && port.longitude) {
       if (type === 'source') {
-        if (sourceRippleRef.current) {
-          mapRef.current.removeLayer(sourceRippleRef.current);
-        }
+        removeRipple(sourceRippleRef);
         setSelectedSourcePort(port);
         sourceRippleRef.current = createRippleEffect(
           port.latitude, 
@@ -136,9 +149,7 @@ const HomePage = () => {
           '#10B981'
         );
       } else if (type === 'destination') {
-        if (destRippleRef.current) {
-          mapRef.current.removeLayer(destRippleRef.current);
-        }
+        removeRipple(destRippleRef);
         setSelectedDestPort(port);
         destRippleRef.current = createRippleEffect(
           port.latitude, 
@@ -158,6 +169,7 @@ const HomePage = () => {
       minZoom: 2,
       maxZoom: 10,
       worldCopyJump: true,
+      preferCanvas: true,
     });
     
     L.tileLayer('https://server.arcgisonline.com/ArcGIS/rest/services/World_Street_Map/MapServer/tile/{z}/{y}/{x}', {
@@ -178,18 +190,9 @@ const HomePage = () => {
         const response = await axiosInstance.get('/port/display-ports');
         const fetchedPorts = response.data;
         
-        fetchedPorts.forEach(port => {
-          if (port.latitude && port.longitude && port.portName) {
-            L.circleMarker([port.latitude, port.longitude], markerOptions)
-              .addTo(mapRef.current)
-              .bindTooltip(`${port.portName}<br/><small>${port.countryName || ''}</small>`, {
-                permanent: false,
-                direction: 'top',
-                offset: [0, -8],
-                className: 'port-tooltip'
-              });
-          }
-        });
+        if (!mapRef.current) return;
+
+        portClusterLayer(fetchedPorts, { markerOptions }).addTo(mapRef.current);
         
         setPorts(fetchedPorts);
       } catch (error) {
@@ -201,15 +204,9 @@ const HomePage = () => {
    
     return () => {
       if (mapRef.current) {
-        if (sourceRippleRef.current) {
-          mapRef.current.removeLayer(sourceRippleRef.current);
-        }
-        if (destRippleRef.current) {
-          mapRef.current.removeLayer(destRippleRef.current);
-        }
-        if (pathLayerRef.current) {
-          mapRef.current.removeLayer(pathLayerRef.current);
-        }
+        removeRipple(sourceRippleRef);
+        removeRipple(destRippleRef);
+        clearPath();
         mapRef.current.remove();
         mapRef.current = null;
       }
@@ -232,8 +229,16 @@ const HomePage = () => {
         .port-tooltip::before {
           border-top-color: #374151 !important;
         }
-        .shipping-route {
-          filter: drop-shadow(0 2px 4px rgba(0, 0, 0, 0.3));
+        .port-cluster {
+          display: flex;
+          align-items: center;
+          justify-content: center;
+          background-color: rgba(255, 120, 0, 0.85);
+          border: 2px solid #000;
+          border-radius: 9999px;
+          color: #000;
+          font-size: 12px;
+          font-weight: 700;
         }
       `}</style>
       
@@ -0,0 +1,116 @@
+import L from 'leaflet';
+
+const CELL_SIZE = 60;
+const VIEW_PADDING = 100;
+
+const tooltipOptions = {
+  permanent: false,
+  direction: 'top',
+  offset: [0, -8],
+  className: 'port-tooltip'
+};
+
+const clusterIcon = (count) => {
+  const size = count < 10 ? 28 : count < 100 ? 34 : 40;
+  return L.divIcon({
+    html: `<span>${count}</span>`,
+    className: 'port-cluster',
+    iconSize: [size, size]
+  });
+};
+
+// Groups ports into screen-space grid cells, so the number of drawn layers
+// depends on the viewport rather than on the size of the port list.
+const PortClusterLayer = L.LayerGroup.extend({
+  options: {
+    markerOptions: {},
+    disableClusteringAtZoom: 8
+  },
+
+  initialize(ports, options) {
+    L.LayerGroup.prototype.initialize.call(this, [], options);
+    this.setPorts(ports);
+  },
+
+  setPorts(ports) {
+    // Projected once at zoom 0; at zoom z the pixel position is this point scaled by 2^z.
+    this._points = ports
+      .filter(port => port.latitude && port.longitude && port.portName)
+      .map(port => {
+        const latlng = L.latLng(port.latitude, port.longitude);
+        return { port, latlng, point: L.CRS.EPSG3857.latLngToPoint(latlng, 0) };
+      });
+    this._update();
+    return this;
+  },
+
+  onAdd(map) {
+    L.LayerGroup.prototype.onAdd.call(this, map);
+    map.on('moveend', this._update, this);
+    this._update();
+  },
+
+  onRemove(map) {
+    map.off('moveend', this._update, this);
+    L.LayerGroup.prototype.onRemove.call(this, map);
+  },
+
+  _update() {
+    const map = this._map;
+    if (!map) return;
+
+    this.clearLayers();
+
+    const zoom = map.getZoom();
+    const scale = Math.pow(2, zoom);
+    const pixelBounds = map.getPixelBounds();
+    const minX = pixelBounds.min.x - VIEW_PADDING;
+    const minY = pixelBounds.min.y - VIEW_PADDING;
+    const maxX = pixelBounds.max.x + VIEW_PADDING;
+    const maxY = pixelBounds.max.y + VIEW_PADDING;
+    const clustering = zoom < this.options.disableClusteringAtZoom;
+
+    const cells = new Map();
+    for (const entry of this._points) {
+      const x = entry.point.x * scale;
+      const y = entry.point.y * scale;
+      if (x < minX || x > maxX || y < minY || y > maxY) continue;
+
+      if (!clustering) {
+        this._addPortMarker(entry);
+        continue;
+      }
+
+      const key = `${Math.floor(x / CELL_SIZE)}:${Math.floor(y / CELL_SIZE)}`;
+      const cell = cells.get(key);
+      if (cell) {
+        cell.entries.push(entry);
+      } else {
+        cells.set(key, { entries: [entry] });
+      }
+    }
+
+    for (const { entries } of cells.values()) {
+      if (entries.length === 1) {
+        this._addPortMarker(entries[0]);
+      } else {
+        this._addClusterMarker(entries);
+      }
+    }
+  },
+
+  _addPortMarker({ port, latlng }) {
+    L.circleMarker(latlng, this.options.markerOptions)
+      .bindTooltip(`${port.portName}<br/><small>${port.countryName || ''}</small>`, tooltipOptions)
+      .addTo(this);
+  },
+
+  _addClusterMarker(entries) {
+    const bounds = L.latLngBounds(entries.map(entry => entry.latlng));
+    L.marker(bounds.getCenter(), { icon: clusterIcon(entries.length) })
+      .on('click', () => this._map.fitBounds(bounds, { padding: [40, 40] }))
+      .addTo(this);
+  }
+});
+
+export const portClusterLayer = (ports, options) => new PortClusterLayer(ports, options);